@@ -1,8 +1,10 @@
+import functools
 import inspect
+import keyword
 import logging
 import typing
-from collections import Counter
-from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+import weakref
+from typing import AbstractSet, Any, Callable, Dict, List, Optional, Tuple, Type, Union
 
 import pandas as pd
 
@@ -29,6 +31,61 @@ except ImportError:
     EllipsisType = type(...)
 
 
+def _cache_per_function(compute: Callable[[Callable], Any]) -> Callable[[Callable], Any]:
+    """Caches the result of `compute` per function object. The cache is keyed weakly, so it does not keep
+    functions (closures, functions from reloaded modules, ...) alive. Callables that cannot be weakly
+    referenced or hashed (e.g. instances of a dataclass with __call__) are computed every time.
+
+    :param compute: Function that computes some (immutable) property of a function
+    :return: The cached version of compute
+    """
+    cache = weakref.WeakKeyDictionary()
+
+    @functools.wraps(compute)
+    def cached(fn: Callable) -> Any:
+        try:
+            return cache[fn]
+        except KeyError:
+            pass
+        except TypeError:  # not hashable/weak-referenceable
+            return compute(fn)
+        cache[fn] = result = compute(fn)
+        return result
+
+    return cached
+
+
+@_cache_per_function
+def _cached_signature(fn: Callable) -> inspect.Signature:
+    """Returns the signature of a function, computing it only once per function object.
+    Signatures are immutable, so they are safe to share between decorators.
+
+    :param fn: Function to get the signature of
+    :return: The signature of the function
+    """
+    return inspect.signature(fn)
+
+
+@_cache_per_function
+def _cached_type_hints(fn: Callable) -> Dict[str, Any]:
+    """Returns the type hints of a function, computing (and evaluating string annotations) only
+    once per function object. Callers must not mutate the result.
+
+    :param fn: Function to get the type hints of
+    :return: The type hints of the function
+    """
+    return typing.get_type_hints(fn)
+
+
+def _return_type(fn: Callable) -> Optional[Type]:
+    """Returns the (cached) return type hint of a function.
+
+    :param fn: Function to get the return type of
+    :return: The return type, or None if the function does not declare one
+    """
+    return _cached_type_hints(fn).get("return")
+
+
 # the following are empty functions that we can compare against to ensure that @does uses an empty function
 def _empty_function():
     pass
@@ -39,15 +96,17 @@ def _empty_function_with_docstring():
     pass
 
 
+_EMPTY_FUNCTION_CO_CODES = frozenset(
+    {_empty_function.__code__.co_code, _empty_function_with_docstring.__code__.co_code}
+)
+
+
 def ensure_function_empty(fn: Callable):
     """
     Ensures that a function is empty. This is strict definition -- the function must have only one line (and
     possibly a docstring), and that line must say "pass".
     """
-    if fn.__code__.co_code not in {
-        _empty_function.__code__.co_code,
-        _empty_function_with_docstring.__code__.co_code,
-    }:
+    if fn.__code__.co_code not in _EMPTY_FUNCTION_CO_CODES:
         raise base.InvalidDecoratorException(
             f"Function: {fn.__name__} is not empty. Must have only one line that "
             'consists of "pass"'
@@ -95,9 +154,15 @@ class does(base.NodeCreator):
         """
         self.replacing_function = replacing_function
         self.argument_mapping = argument_mapping
+        # The mapping is fixed from here on, so anything derived from it is computed once
+        self._mapped_values = frozenset(argument_mapping.values())
 
     @staticmethod
-    def map_kwargs(kwargs: Dict[str, Any], argument_mapping: Dict[str, str]) -> Dict[str, Any]:
+    def map_kwargs(
+        kwargs: Dict[str, Any],
+        argument_mapping: Dict[str, str],
+        mapped_values: AbstractSet[str] = None,
+    ) -> Dict[str, Any]:
         """Maps kwargs using the argument mapping.
         This does 2 things:
         1. Replaces all kwargs in passed_in_kwargs with their mapping
@@ -105,11 +170,15 @@ class does(base.NodeCreator):
 
         :param kwargs: Keyword arguments that will be passed into a hamilton function.
         :param argument_mapping: Mapping of those arguments to a replacing function's arguments.
+        :param mapped_values: The set of values in argument_mapping. Pass this in if you have it \
+        precomputed, otherwise it is derived from argument_mapping.
         :return: The new kwargs for the replacing function's arguments.
         """
+        if mapped_values is None:
+            mapped_values = frozenset(argument_mapping.values())
         output = {**kwargs}
         for arg_mapped_to, original_arg in argument_mapping.items():
-            if original_arg in kwargs and arg_mapped_to not in argument_mapping.values():
+            if original_arg in kwargs and arg_mapped_to not in mapped_values:
                 del output[original_arg]
             # Note that if it is not there it could be a **kwarg
             output[arg_mapped_to] = kwargs[original_arg]
@@ -120,26 +189,25 @@ class does(base.NodeCreator):
         fn_signature: inspect.Signature,
         replace_with_signature: inspect.Signature,
         argument_mapping: Dict[str, str],
+        mapped_values: AbstractSet[str] = None,
     ) -> bool:
         """Tests whether a function signature and the signature of the replacing function are compatible.
 
         :param fn_signature:
         :param replace_with_signature:
         :param argument_mapping:
+        :param mapped_values: The set of values in argument_mapping, if precomputed. See `map_kwargs`.
         :return: True if they're compatible, False otherwise
         """
         # The easy (and robust) way to do this is to use the bind with a set of dummy arguments and test if it breaks.
         # This way we're not reinventing the wheel.
         SENTINEL_ARG_VALUE = ...  # does not matter as we never use it
-        # We initialize as the default values, as they'll always be injected in
-        dummy_param_values = {
-            key: SENTINEL_ARG_VALUE
-            for key, param_spec in fn_signature.parameters.items()
-            if param_spec.default != inspect.Parameter.empty
-        }
-        # Then we update with the dummy values. Again, replacing doesn't matter (we'll be mimicking it later)
-        dummy_param_values.update({key: SENTINEL_ARG_VALUE for key in fn_signature.parameters})
-        dummy_param_values = does.map_kwargs(dummy_param_values, argument_mapping)
+        # Every parameter gets a value -- defaults are always injected, so they're covered as well
+        dummy_param_values = {key: SENTINEL_ARG_VALUE for key in fn_signature.parameters}
+        if argument_mapping:
+            dummy_param_values = does.map_kwargs(
+                dummy_param_values, argument_mapping, mapped_values
+            )
         try:
             # Python signatures have a bind() capability which does exactly what we want to do
             # Throws a type error if it is not valid
@@ -150,16 +218,22 @@ class does(base.NodeCreator):
 
     @staticmethod
     def ensure_function_signature_compatible(
-        og_function: Callable, replacing_function: Callable, argument_mapping: Dict[str, str]
+        og_function: Callable,
+        replacing_function: Callable,
+        argument_mapping: Dict[str, str],
+        mapped_values: AbstractSet[str] = None,
     ):
         """Ensures that a function signature is compatible with the replacing function, given the argument mapping
 
         :param og_function: Function that's getting replaced (decorated with `@does`)
         :param replacing_function: A function that gets called in its place (passed in by `@does`)
         :param argument_mapping: The mapping of arguments from fn to replace_with
+        :param mapped_values: The set of values in argument_mapping, if precomputed. See `map_kwargs`.
         :return:
         """
-        fn_parameters = inspect.signature(og_function).parameters
+        fn_signature = _cached_signature(og_function)
+        replace_with_signature = _cached_signature(replacing_function)
+        fn_parameters = fn_signature.parameters
         invalid_fn_parameters = []
         for param_name, param_spec in fn_parameters.items():
             if param_spec.kind not in {
@@ -175,16 +249,69 @@ class does(base.NodeCreator):
                 f"The following parameters for {og_function.__name__} are not keyword-friendly: {invalid_fn_parameters}"
             )
         if not does.test_function_signatures_compatible(
-            inspect.signature(og_function), inspect.signature(replacing_function), argument_mapping
+            fn_signature, replace_with_signature, argument_mapping, mapped_values
         ):
             raise base.InvalidDecoratorException(
                 f"The following function signatures are not compatible for use with @does: "
-                f"{og_function.__name__} with signature {inspect.signature(og_function)} "
-                f"and replacing function {replacing_function.__name__} with signature {inspect.signature(replacing_function)}. "
+                f"{og_function.__name__} with signature {fn_signature} "
+                f"and replacing function {replacing_function.__name__} with signature {replace_with_signature}. "
                 f"Mapping for arguments provided was: {argument_mapping}. You can fix this by either adjusting "
                 f"the signature for the replacing function *or* adjusting the mapping."
             )
 
+    @staticmethod
+    def _build_wrapper_function(
+        fn_signature: inspect.Signature,
+        replacing_function: Callable,
+        argument_mapping: Dict[str, str],
+        mapped_values: AbstractSet[str],
+    ) -> Callable:
+        """Generates the function that a `@does` node calls in place of the decorated function.
+
+        The set of kwargs a node receives is fixed by the decorated function's signature (required
+        parameters are always passed, optional ones fall back to their defaults), so we can resolve
+        the argument mapping once, here, and compile a function that forwards each parameter
+        straight to the replacing function. This avoids merging/mapping dictionaries on every call.
+
+        :param fn_signature: Signature of the function decorated with `@does`
+        :param replacing_function: Function to call in its place
+        :param argument_mapping: Mapping of replacing function arguments to decorated function arguments
+        :param mapped_values: The set of values in argument_mapping
+        :return: A function taking the decorated function's parameters (as keyword-only).
+        """
+        parameter_names = list(fn_signature.parameters)
+        # Run the mapping over the parameter names themselves -- this tells us which
+        # parameter each argument of the replacing function should be fed from
+        forwarded_from = does.map_kwargs(
+            {name: name for name in parameter_names}, argument_mapping, mapped_values
+        )
+        # The replacing function is a global in the generated code, so it cannot share a name with a parameter
+        replacing_function_name = "__replacing_function"
+        while replacing_function_name in fn_signature.parameters:
+            replacing_function_name = "_" + replacing_function_name
+        namespace = {"__name__": __name__, replacing_function_name: replacing_function}
+        parameters = []
+        for i, (name, param_spec) in enumerate(fn_signature.parameters.items()):
+            if param_spec.default is inspect.Parameter.empty:
+                parameters.append(name)
+            else:
+                # Defaults are evaluated when the function is defined, so these never clash with parameters
+                namespace[f"__default_{i}"] = param_spec.default
+                parameters.append(f"{name}=__default_{i}")
+        arguments = [
+            # argument_mapping keys come in as **kwargs, so they may not be valid python identifiers
+            f"{key}={source}"
+            if key.isidentifier() and not keyword.iskeyword(key)
+            else f"**{{{key!r}: {source}}}"
+            for key, source in forwarded_from.items()
+        ]
+        source_code = (
+            f"def wrapper_function({'*, ' + ', '.join(parameters) if parameters else ''}):\n"
+            f"    return {replacing_function_name}({', '.join(arguments)})\n"
+        )
+        exec(compile(source_code, "<@does wrapper_function>", "exec"), namespace)
+        return namespace["wrapper_function"]
+
     def validate(self, fn: Callable):
         """Validates that the function:
         - Is empty (we don't want to be overwriting actual code)
@@ -195,7 +322,7 @@ class does(base.NodeCreator):
         """
         ensure_function_empty(fn)
         does.ensure_function_signature_compatible(
-            fn, self.replacing_function, self.argument_mapping
+            fn, self.replacing_function, self.argument_mapping, self._mapped_values
         )
 
     def generate_nodes(self, fn: Callable, config) -> List[node.Node]:
@@ -205,17 +332,12 @@ class does(base.NodeCreator):
         :return: A node with the function in `@does` injected,
         and the same parameters/types as the original function.
         """
-
-        def wrapper_function(**kwargs):
-            final_kwarg_values = {
-                key: param_spec.default
-                for key, param_spec in inspect.signature(fn).parameters.items()
-                if param_spec.default != inspect.Parameter.empty
-            }
-            final_kwarg_values.update(kwargs)
-            final_kwarg_values = does.map_kwargs(final_kwarg_values, self.argument_mapping)
-            return self.replacing_function(**final_kwarg_values)
-
+        wrapper_function = does._build_wrapper_function(
+            _cached_signature(fn),
+            self.replacing_function,
+            self.argument_mapping,
+            self._mapped_values,
+        )
         return [node.Node.from_fn(fn).copy_with(callabl=wrapper_function)]
 
 
@@ -225,8 +347,8 @@ def get_default_tags(fn: Callable) -> Dict[str, str]:
     :param fn: the function we want to create default tags for.
     :return: a dictionary with str -> str values representing the default tags.
     """
-    module_name = inspect.getmodule(fn).__name__
-    return {"module": module_name}
+    # The function already knows its module name -- no need to look the module up via inspect.getmodule
+    return {"module": fn.__module__}
 
 
 @deprecated(
@@ -258,8 +380,8 @@ class dynamic_transform(base.NodeCreator):
         """
 
         ensure_function_empty(fn)  # it has to look exactly
-        signature = inspect.signature(fn)
-        if not issubclass(typing.get_type_hints(fn).get("return"), pd.Series):
+        signature = _cached_signature(fn)
+        if not issubclass(_return_type(fn), pd.Series):
             raise base.InvalidDecoratorException(
                 "Models must declare their return type as a pandas Series"
             )
@@ -280,7 +402,7 @@ class dynamic_transform(base.NodeCreator):
         return [
             node.Node(
                 name=fn_name,
-                typ=typing.get_type_hints(fn).get("return"),
+                typ=_return_type(fn),
                 doc_string=fn.__doc__,
                 callabl=transform.compute,
                 input_types={dep: pd.Series for dep in transform.get_dependents()},
@@ -312,12 +434,15 @@ class Applicable:
     """Applicable is a largely internal construct that represents a function that can be applied as a node.
     A few of these function are external-facing, however (named, when, when_not, ...)"""
 
+    # A new Applicable is created for every step of the fluent API, so we keep them light
+    __slots__ = ("fn", "args", "kwargs", "resolvers", "name", "namespace")
+
     def __init__(
         self,
         fn: Callable,
         args: Tuple[Union[Any, SingleDependency], ...],
         kwargs: Dict[str, Union[Any, SingleDependency]],
-        _resolvers: List[ConfigResolver] = None,
+        _resolvers: Tuple[ConfigResolver, ...] = None,
         _name: Optional[str] = None,
         _namespace: Union[str, None, EllipsisType] = ...,
     ):
@@ -334,23 +459,34 @@ class Applicable:
         if "_name" in kwargs:
             raise ValueError("Cannot pass in _name as a kwarg")
 
-        self.kwargs = {key: value for key, value in kwargs.items() if key != "__name"}  # TODO --
+        # kwargs are never mutated, so Applicables derived from this one can share them
+        self.kwargs = kwargs
         self.args = args
-        # figure out why this was showing up in two places...
-        self.resolvers = _resolvers if _resolvers is not None else []
+        self.resolvers = tuple(_resolvers) if _resolvers is not None else ()
         self.name = _name
         self.namespace = _namespace
 
-    def _with_resolvers(self, *additional_resolvers: ConfigResolver) -> "Applicable":
-        """Helper function for the .when* group"""
-        return Applicable(
+    def _copy_with(self, **overrides: Any) -> "Applicable":
+        """Helper function to create a new Applicable with some constructor arguments replaced.
+        Everything else (fn, args, kwargs, ...) is shared with this one.
+
+        :param overrides: Constructor arguments to use in place of this Applicable's
+        :return: A new Applicable
+        """
+        constructor_args = dict(
             fn=self.fn,
-            _resolvers=self.resolvers + list(additional_resolvers),
-            _name=self.name,
-            _namespace=self.namespace,
             args=self.args,
             kwargs=self.kwargs,
+            _resolvers=self.resolvers,
+            _name=self.name,
+            _namespace=self.namespace,
         )
+        constructor_args.update(overrides)
+        return Applicable(**constructor_args)
+
+    def _with_resolvers(self, *additional_resolvers: ConfigResolver) -> "Applicable":
+        """Helper function for the .when* group"""
+        return self._copy_with(_resolvers=(*self.resolvers, *additional_resolvers))
 
     def when(self, **key_value_pairs) -> "Applicable":
         """Choose to apply this function when all of the keys in the function
@@ -395,14 +531,7 @@ class Applicable:
         :param namespace: Namespace to apply, can be ..., None, or a string.
         :return: The Applicable with this namespace
         """
-        return Applicable(
-            fn=self.fn,
-            _resolvers=self.resolvers,
-            _name=self.name,
-            _namespace=namespace,
-            args=self.args,
-            kwargs=self.kwargs,
-        )
+        return self._copy_with(_namespace=namespace)
 
     def resolves(self, config: Dict[str, Any]) -> bool:
         """Returns whether the Applicable resolves with the given config
@@ -410,10 +539,10 @@ class Applicable:
         :param config: Configuration to check
         :return: Whether the Applicable resolves with the given config
         """
-        for resolver in self.resolvers:
-            if not resolver(config):
-                return False
-        return True
+        if not self.resolvers:
+            # Fast path for the common case of an unconditional step
+            return True
+        return all(resolver(config) for resolver in self.resolvers)
 
     def named(self, name: str, namespace: NamespaceType = ...) -> "Applicable":
         """Names the function application. This has the following rules:
@@ -428,15 +557,11 @@ class Applicable:
         :param namespace: Namespace of the node to be created -- currently only single-level namespaces are supported
         :return: The applicable with the new name
         """
-        return Applicable(
-            fn=self.fn,
-            _resolvers=self.resolvers,
+        return self._copy_with(
             _name=name if name is not None else self.name,
             _namespace=None
             if namespace is None
             else (namespace if namespace is not ... else self.namespace),
-            args=self.args,
-            kwargs=self.kwargs,
         )
 
     def get_config_elements(self) -> List[str]:
@@ -463,7 +588,7 @@ class Applicable:
         :return:
         """
         args = ((...,) if chain_first_param else ()) + tuple(self.args)  # dummy argument at first
-        sig = inspect.signature(self.fn)
+        sig = _cached_signature(self.fn)
         if len(sig.parameters) == 0:
             raise base.InvalidDecoratorException(
                 f"Function: {self.fn.__name__} has no parameters. "
@@ -471,7 +596,7 @@ class Applicable:
             )
         invalid_args = [
             item
-            for item in inspect.signature(self.fn).parameters.values()
+            for item in sig.parameters.values()
             if item.kind
             not in {inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY}
         ]
@@ -536,7 +661,7 @@ class Applicable:
         if current_param is not None:
             args_to_bind = (source(current_param),) + args_to_bind
         kwargs_to_bind = self.kwargs
-        fn_signature = inspect.signature(self.fn)
+        fn_signature = _cached_signature(self.fn)
         bound_signature = fn_signature.bind(*args_to_bind, **kwargs_to_bind)
         all_kwargs = {**bound_signature.arguments, **bound_signature.kwargs}
         upstream_inputs = {}
@@ -567,7 +692,7 @@ def step(
     they will be converted to a value (a literal)
     :return: an applicable with the function applied
     """
-    return Applicable(fn=fn, _resolvers=[], args=args, kwargs=kwargs)
+    return Applicable(fn=fn, args=args, kwargs=kwargs)
 
 
 class pipe(base.NodeInjector):
@@ -743,6 +868,11 @@ class pipe(base.NodeInjector):
         self.collapse = collapse
         self.chain = _chain
         self.namespace = namespace
+        # Applicables (and their resolvers) are immutable, so we can gather this once, up front
+        self._optional_config = {}
+        for applicable in self.transforms:
+            for resolver in applicable.resolvers:
+                self._optional_config.update(resolver.optional_config)
 
         if self.collapse:
             raise NotImplementedError(
@@ -757,13 +887,19 @@ class pipe(base.NodeInjector):
     ) -> Tuple[List[node.Node], Dict[str, str]]:
         """Injects nodes into the graph. This creates a node for each pipe() step,
         then reassigns the inputs to pass it in."""
-        sig = inspect.signature(fn)
-        first_parameter = list(sig.parameters.values())[0].name
+        sig = _cached_signature(fn)
+        # parameters is an ordered mapping keyed by name, so we can grab the first without building a list
+        first_parameter = next(iter(sig.parameters), None)
         # use the name of the parameter to determine the first node
         # Then wire them all through in order
         # if it resolves, great
         # if not, skip that, pointing to the previous
         # Create a node along the way
+        if first_parameter is None:
+            raise base.InvalidDecoratorException(
+                f"Function: {fn.__name__} has no parameters. "
+                f"@pipe chains its steps into the first parameter, so the decorated function must have one."
+            )
         if first_parameter not in params:
             raise base.InvalidDecoratorException(
                 f"Function: {fn.__name__} has a first parameter that is not a dependency. "
@@ -771,7 +907,10 @@ class pipe(base.NodeInjector):
                 f"Thus it might not be compatible with some other decorators"
             )
         current_param = first_parameter
-        fn_count = Counter()
+        fn_count: Dict[str, int] = {}
+        # Steps often reuse the same function, so we only introspect each function once
+        # and derive the actual (renamed/rewired) nodes from the template
+        template_nodes: Dict[Callable, node.Node] = {}
         nodes = []
         for applicable in self.transforms:
             if self.namespace is not ...:
@@ -780,20 +919,24 @@ class pipe(base.NodeInjector):
                 )  # we reassign the global namespace
             if applicable.resolves(config):
                 fn_name = applicable.fn.__name__
-                postfix = "" if fn_count[fn_name] == 0 else f"_{fn_count[fn_name]}"
-                node_name = (
-                    applicable.name
-                    if applicable.name is not None
-                    else f"with{('_' if not fn_name.startswith('_') else '') + fn_name}{postfix}"
-                )
-                raw_node = node.Node.from_fn(
-                    applicable.fn,
-                    f"with{('_' if not fn_name.startswith('_') else '') + fn_name}{postfix}",
-                )
+                count = fn_count.get(fn_name, 0)
+                postfix = "" if count == 0 else f"_{count}"
+                default_name = f"with{'_' if not fn_name.startswith('_') else ''}{fn_name}{postfix}"
+                node_name = applicable.name if applicable.name is not None else default_name
+                if applicable.fn not in template_nodes:
+                    template_nodes[applicable.fn] = node.Node.from_fn(applicable.fn)
+                raw_node = template_nodes[applicable.fn]
                 node_namespace = applicable.resolve_namespace(fn.__name__)
-                raw_node = raw_node.copy_with(namespace=node_namespace, name=node_name)
+                # The template is shared, so we can't share its (later populated) dependency references
+                # or its tags (which can be modified in place, e.g. by Node.add_tag)
+                raw_node = raw_node.copy_with(
+                    include_refs=False,
+                    namespace=node_namespace,
+                    name=node_name,
+                    tags={**raw_node.tags},
+                )
                 # TODO -- validate that the first parameter is the right type/all the same
-                fn_count[fn_name] += 1
+                fn_count[fn_name] = count + 1
                 upstream_inputs, literal_inputs = applicable.bind_function_args(current_param)
                 nodes.append(
                     raw_node.reassign_inputs(
@@ -821,11 +964,7 @@ class pipe(base.NodeInjector):
         if we have no idea what they are, which bypasses the configuration filtering we use entirely.
         This is mainly for the legacy API.
         """
-        out = {}
-        for applicable in self.transforms:
-            for resolver in applicable.resolvers:
-                out.update(resolver.optional_config)
-        return out
+        return self._optional_config
 
 
 # # TODO -- implement flow!
@@ -1,3 +1,4 @@
+import dataclasses
 import inspect
 import sys
 from typing import List, Set
@@ -188,6 +189,54 @@ def test_does_with_argument_mapping():
     assert node_.documentation == to_modify.__doc__
 
 
+def test_does_with_swapped_argument_mapping():
+    def _subtract(a: int, b: int) -> int:
+        return a - b
+
+    def to_modify(a: int, b: int = 1) -> int:
+        """Subtracts a from b"""
+        pass
+
+    annotation = does(_subtract, a="b", b="a")
+    (node_,) = annotation.generate_nodes(to_modify, {})
+    assert node_.callable(a=10) == -9
+    assert node_.callable(a=10, b=3) == -7
+
+
+def test_does_wrapper_function_signature():
+    def _identity(**kwargs: int) -> dict:
+        return kwargs
+
+    def to_modify(__replacing_function: int, param1: int = 1) -> dict:
+        pass
+
+    annotation = does(_identity, **{"class": "param1"})
+    (node_,) = annotation.generate_nodes(to_modify, {})
+    sig = inspect.signature(node_.callable)
+    assert list(sig.parameters) == ["__replacing_function", "param1"]
+    assert all(param.kind == inspect.Parameter.KEYWORD_ONLY for param in sig.parameters.values())
+    assert node_.callable(__replacing_function=0) == {"__replacing_function": 0, "class": 1}
+
+
+@dataclasses.dataclass
+class _Adder:
+    # dataclasses define __eq__ and not __hash__, so instances are unhashable
+    offset: int
+
+    def __call__(self, a: int, b: int) -> int:
+        return a + b + self.offset
+
+
+def test_does_with_unhashable_replacing_function():
+    def to_modify(a: int, b: int) -> int:
+        pass
+
+    annotation = does(_Adder(offset=0))
+    annotation.validate(to_modify)
+    (node_,) = annotation.generate_nodes(to_modify, {})
+    assert node_.callable(a=1, b=1) == 2
+
+
 def test_model_modifier():
     config = {
         "my_column_model_params": {
@@ -215,6 +264,7 @@ def test_model_modifier():
     (model_node,) = annotation.generate_nodes(my_column, config)
     assert model_node.input_types["col_1"][0] == model_node.input_types["col_2"][0] == pd.Series
     assert model_node.type == pd.Series
+    assert model_node.tags["module"] == __name__
     pd.testing.assert_series_equal(
         model_node.callable(col_1=pd.Series([1]), col_2=pd.Series([2])), pd.Series([1.5])
     )
@@ -380,6 +430,61 @@ def test_pipe_decorator_no_collapse_multi_node():
     assert final_node(node_2=100) == 100
 
 
+def test_pipe_decorator_repeated_function():
+    n = node.Node.from_fn(general_downstream_function)
+
+    decorator = pipe(
+        step(_test_apply_function_2),
+        step(_test_apply_function_2),
+        step(_test_apply_function_2).named("node_3"),
+        namespace=None,
+    )
+    nodes = decorator.transform_dag([n], {}, general_downstream_function)
+    nodes_by_name = {item.name: item for item in nodes}
+    assert sorted(nodes_by_name) == [
+        "general_downstream_function",
+        "node_3",
+        "with_test_apply_function_2",
+        "with_test_apply_function_2_1",
+    ]
+    assert nodes_by_name["with_test_apply_function_2"](result=1) == 2
+    assert sorted(nodes_by_name["with_test_apply_function_2_1"].input_types) == [
+        "with_test_apply_function_2"
+    ]
+    assert sorted(nodes_by_name["node_3"].input_types) == ["with_test_apply_function_2_1"]
+    assert sorted(nodes_by_name["general_downstream_function"].input_types) == ["node_3"]
+    # Nodes built from the same function must not share mutable state
+    step_nodes = [
+        nodes_by_name[name]
+        for name in ["with_test_apply_function_2", "with_test_apply_function_2_1", "node_3"]
+    ]
+    assert len({id(step_node.tags) for step_node in step_nodes}) == 3
+    step_nodes[0].add_tag("foo", "bar")
+    assert "foo" not in step_nodes[1].tags and "foo" not in step_nodes[2].tags
+
+
+def test_pipe_decorator_fails_with_no_parameters():
+    def no_parameters() -> int:
+        return 1
+
+    n = node.Node.from_fn(no_parameters)
+    decorator = pipe(step(_test_apply_function_2))
+    with pytest.raises(
+        hamilton.function_modifiers.base.InvalidDecoratorException, match="has no parameters"
+    ):
+        decorator.transform_dag([n], {}, no_parameters)
+
+
+def test_pipe_optional_config():
+    decorator = pipe(
+        step(_test_apply_function_2).when(foo="bar"),
+        step(_test_apply_function_2).when_not_in(baz=["qux"]),
+        step(_test_apply_function_2),
+    )
+    assert decorator.optional_config() == {"foo": None, "baz": None}
+    assert pipe(step(_test_apply_function_2)).optional_config() == {}
+
+
 def test_resolve_namespace_inherit():
     applicable = Applicable(
         _test_apply_function, args=(), kwargs=dict(bar=source("bar_upstream"), baz=100)